@@ -1,8 +1,163 @@
+import atexit
+import glob
+import math
+import os
+import queue
+import threading
 import time
 import GPUtil
 import sys
+import comfy.model_management
 from comfy.comfy_types import IO
 
+# Prefer direct NVML bindings: GPUtil shells out to nvidia-smi on every call,
+# which is slow and can wake a sleeping dGPU. Fall back to GPUtil if NVML is
+# unavailable.
+try:
+    import pynvml
+    pynvml.nvmlInit()
+    atexit.register(pynvml.nvmlShutdown)
+    _nvml_handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+except Exception:
+    pynvml = None
+    _nvml_handles = None
+
+# Probe once per process for a usable NVIDIA driver so CPU-only hosts skip
+# the cool down entirely instead of failing on every run
+if _nvml_handles:
+    _HAS_GPU = True
+else:
+    try:
+        _HAS_GPU = bool(GPUtil.getGPUs())
+    except Exception:
+        _HAS_GPU = False
+
+
+def _get_gpu_temperatures():
+    """
+    Returns the current temperature of each GPU in Celsius.
+
+    Uses cached NVML handles when available, otherwise GPUtil. Either way a
+    poll costs one driver query per GPU (NVML) or one nvidia-smi run (GPUtil);
+    nvmlDeviceGetFieldValues has no field for the current core temperature,
+    so it cannot batch this any further.
+    """
+    if _nvml_handles is not None:
+        return [float(pynvml.nvmlDeviceGetTemperature(h, pynvml.NVML_TEMPERATURE_GPU)) for h in _nvml_handles]
+    return [float(gpu.temperature) for gpu in GPUtil.getGPUs()]
+
+
+_power_state_paths = None
+
+
+def _gpu_is_awake():
+    """
+    Returns False if every NVIDIA GPU is suspended (D3cold/D3hot) according to
+    Linux runtime power management. A suspended GPU is cool by definition, and
+    querying its temperature would wake it up.
+    """
+    global _power_state_paths
+    if _power_state_paths is None:
+        _power_state_paths = glob.glob("/sys/module/nvidia/drivers/pci:nvidia/*:*/power_state")
+
+    if not _power_state_paths:
+        # Not Linux, or no runtime PM info available
+        return True
+
+    for path in _power_state_paths:
+        try:
+            with open(path) as f:
+                if f.read().strip() not in ("D3cold", "D3hot"):
+                    return True
+        except OSError:
+            return True
+    return False
+
+
+def _poll_interval_default():
+    """Default GPU polling interval, overridable via HOLDUP_POLL_INTERVAL_SECONDS."""
+    try:
+        seconds = int(os.environ.get("HOLDUP_POLL_INTERVAL_SECONDS", 5))
+    except ValueError:
+        seconds = 5
+    return max(1, min(30, seconds))
+
+
+# HOLDUP_ASCII_BAR=1 draws the progress bar with '#' instead of the 3-byte '█'
+_BAR_FILL = '#' if os.environ.get("HOLDUP_ASCII_BAR", "").strip().lower() in ("1", "true", "yes") else '█'
+
+
+class _TempPoller(threading.Thread):
+    """
+    Daemon thread that samples the hottest GPU temperature and pushes
+    (timestamp, max_temp) readings onto a queue. Sampling and its adaptive
+    sleeps run here; the node thread wakes on each new reading and once a
+    second to check for cancellation.
+
+    max_temp is None when the GPUs are suspended or absent, and the raised
+    exception if the query failed. Polling stops after such a reading, after a
+    reading at or below the target, or when stop() is called.
+    """
+
+    def __init__(self, target_temp, max_interval):
+        super().__init__(name="HoldUpTempPoller", daemon=True)
+        self.target_temp = target_temp
+        self.max_interval = max_interval
+        self.readings = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        # Bind loop-invariant lookups to locals
+        _is_awake = _gpu_is_awake
+        _get_temps = _get_gpu_temperatures
+        _monotonic = time.monotonic
+        _put = self.readings.put
+        _wait = self._stop_event.wait
+        target_temp = self.target_temp
+        max_interval = self.max_interval
+        # Fast polls are only cheap with NVML; each GPUtil poll runs
+        # nvidia-smi, so don't go below the shortest user-selectable interval
+        use_nvml = _nvml_handles is not None
+        min_interval = 0.5 if use_nvml else min(1, max_interval)
+
+        last_temp = None
+        last_time = None
+
+        while not self._stop_event.is_set():
+            now = _monotonic()
+            if not _is_awake():
+                # Suspended GPUs are cold; don't wake them to ask
+                _put((now, None))
+                return
+
+            try:
+                highest_temp = max(_get_temps(), default=None)
+            except Exception as e:
+                _put((now, e))
+                return
+
+            _put((now, highest_temp))
+            if highest_temp is None or highest_temp <= target_temp:
+                return
+
+            # Adaptive polling: sleep longer while far from target,
+            # shorter as the estimated time to reach it shrinks, and (with
+            # NVML) poll finely once within a couple of degrees
+            if use_nvml and highest_temp - target_temp <= 2:
+                sleep_s = min_interval
+            elif last_temp is None:
+                sleep_s = max_interval
+            else:
+                cooling_rate = (last_temp - highest_temp) / max(now - last_time, 1e-3)
+                eta = (highest_temp - target_temp) / max(cooling_rate, 0.05)
+                sleep_s = max(min_interval, min(max_interval, eta / 4))
+            last_temp = highest_temp
+            last_time = now
+            _wait(sleep_s)
+
 
 class HoldUp:
     """
@@ -18,32 +173,45 @@ class HoldUp:
                 "use_waitTemperature": ("BOOLEAN", {"default": True}),
                 "waitTemperature": ("INT", {"default": 50, "min": 45, "max": 90}),
                 "waitSeconds": ("INT", {"default": 0, "min": 0, "max": 120}),
-            }
+            },
+            # Optional so prompts saved before this input existed still validate
+            "optional": {
+                "pollIntervalSeconds": ("INT", {"default": cls.POLL_INTERVAL_DEFAULT, "min": 1, "max": 30, "tooltip": "Maximum seconds between GPU temperature checks."}),
+            },
         }
 
+    POLL_INTERVAL_DEFAULT = _poll_interval_default()
+
     RETURN_TYPES = (IO.ANY,)
     FUNCTION = "execute_cool_down"
     CATEGORY = "utils"
     OUTPUT_NODE = False
 
+    _last_bar_state = None
+
+    # Every possible default-length (50) progress bar, indexed by filled length
+    _BARS = tuple(_BAR_FILL * i + '-' * (50 - i) for i in range(51))
+
     @classmethod
     def IS_CHANGED(cls, **kwargs):
+        # Nothing to wait for, so let ComfyUI reuse cached results
+        if kwargs.get("waitSeconds") == 0 and not kwargs.get("use_waitTemperature"):
+            return "static"
         # Always execute to ensure wait happens
         return float("nan")
 
-    def _display_temperature_progress(self, current_temp, target_temp, initial_peak_temp, bar_length=50):
+    def _display_temperature_progress(self, current_temp, target_temp, initial_peak_temp, bar_length=50, suffix=""):
         """
         Displays a text-based progress bar for GPU temperature cooldown.
 
         Args:
             current_temp (float): The current highest temperature of the GPUs.
-            target_temp (float): The target cool-down temperature.
+            target_temp (float): The target cool-down temperature (already a float).
             initial_peak_temp (float): The highest temperature recorded when this
                                       cooldown cycle started or subsequently peaked.
             bar_length (int): The character length of the progress bar.
+            suffix (str): Text written after the bar in the same write call.
         """
-        target_temp = float(target_temp)
-
         if initial_peak_temp <= target_temp:
             # Started at or below target
             progress = 1.0 if current_temp <= target_temp else 0.0
@@ -63,15 +231,25 @@ class HoldUp:
             progress = max(0, min(1, progress))
 
         filled_length = int(bar_length * progress)
-        bar_chars = '█' * filled_length + '-' * (bar_length - filled_length)
+
+        # Skip redrawing an identical line (sensors often repeat between polls)
+        state = (round(current_temp, 1), round(initial_peak_temp, 1), filled_length)
+        if state == self._last_bar_state and not suffix:
+            return
+        self._last_bar_state = state
+
+        if bar_length == len(self._BARS) - 1:
+            bar_chars = self._BARS[filled_length]
+        else:
+            bar_chars = _BAR_FILL * filled_length + '-' * (bar_length - filled_length)
 
         status_message = f"***** Cooling GPUs: Peak: {initial_peak_temp:.1f}°C"
         full_line = f"\r{status_message} |{bar_chars}| {current_temp:.1f}°C / {target_temp:.1f}°C      "
 
-        sys.stdout.write(full_line)
+        sys.stdout.write(full_line + suffix)
         sys.stdout.flush()
 
-    def execute_cool_down(self, input, use_waitTemperature, waitTemperature, waitSeconds):
+    def execute_cool_down(self, input, use_waitTemperature, waitTemperature, waitSeconds, pollIntervalSeconds=None):
         """
         Waits for GPU(s) to cool down and/or a fixed time delay before returning input.
 
@@ -80,70 +258,101 @@ class HoldUp:
             use_waitTemperature (bool): Whether to wait for GPU temperature.
             waitTemperature (int): Target temperature in Celsius.
             waitSeconds (int): Additional seconds to wait.
+            pollIntervalSeconds (int): Maximum seconds between GPU temperature checks.
+                                       Checks speed up as the GPU nears the target.
 
         Returns:
             tuple: The input data unchanged.
         """
-        if use_waitTemperature:
+        if pollIntervalSeconds is None:
+            pollIntervalSeconds = self.POLL_INTERVAL_DEFAULT
+
+        if use_waitTemperature and _HAS_GPU:
             initial_peak_temp_this_hot_cycle = None
             cooling_message_printed_this_cycle = False
+            self._last_bar_state = None
+            target_f = float(waitTemperature)
 
-            while True:
-                try:
-                    gpus = GPUtil.getGPUs()
-                except Exception as e:
-                    print(f"\nError accessing GPU information: {e}. Skipping cool down.", file=sys.stderr)
-                    return (input,)
-
-                if not gpus:
-                    # No GPUs detected, skip cooldown
-                    break
+            # Bind loop-invariant lookups to locals
+            _display = self._display_temperature_progress
+            _check_interrupted = comfy.model_management.throw_exception_if_processing_interrupted
 
-                highest_current_temp = 0.0
-                any_gpu_too_hot = False
-
-                for gpu in gpus:
-                    current_gpu_temp = float(gpu.temperature)
-                    if current_gpu_temp > highest_current_temp:
-                        highest_current_temp = current_gpu_temp
-                    if current_gpu_temp > waitTemperature:
-                        any_gpu_too_hot = True
-
-                if any_gpu_too_hot:
-                    if initial_peak_temp_this_hot_cycle is None:
-                        initial_peak_temp_this_hot_cycle = highest_current_temp
-
-                    # Update peak if temperature spikes higher mid-cooldown
-                    if highest_current_temp > initial_peak_temp_this_hot_cycle:
-                        initial_peak_temp_this_hot_cycle = highest_current_temp
-
-                    if not cooling_message_printed_this_cycle:
-                        print(f"***** GPU temperature ({highest_current_temp:.1f}°C) exceeds target ({waitTemperature}°C). Initiating cool down...")
-                        cooling_message_printed_this_cycle = True
-
-                    self._display_temperature_progress(highest_current_temp, float(waitTemperature), initial_peak_temp_this_hot_cycle)
-                    time.sleep(2)
-                else:
-                    if initial_peak_temp_this_hot_cycle is not None:
-                        # Display final 100% progress
-                        self._display_temperature_progress(float(waitTemperature), float(waitTemperature), initial_peak_temp_this_hot_cycle)
-                        sys.stdout.write("\n***** GPU cool down complete. Temperature is at or below target.\n")
-                        sys.stdout.flush()
-
-                    initial_peak_temp_this_hot_cycle = None
-                    cooling_message_printed_this_cycle = False
-                    break
+            poller = _TempPoller(target_f, pollIntervalSeconds)
+            readings = poller.readings
+            poller.start()
+            try:
+                while True:
+                    # Honor ComfyUI's Cancel button; the poller is stopped below
+                    _check_interrupted()
+                    try:
+                        # Wake at least once a second to check for cancellation,
+                        # and so a dead poller thread can't hang the node
+                        _, highest_current_temp = readings.get(timeout=1)
+                    except queue.Empty:
+                        if poller.is_alive():
+                            continue
+                        # The poller may have pushed its final reading just
+                        # after the timeout; process it before giving up
+                        try:
+                            _, highest_current_temp = readings.get_nowait()
+                        except queue.Empty:
+                            break
+
+                    if highest_current_temp is None:
+                        # No GPUs detected or GPUs suspended, skip cooldown
+                        if initial_peak_temp_this_hot_cycle is not None:
+                            # End the progress line left by a cool down in progress
+                            print("\n***** GPU suspended or unavailable. Skipping cool down.")
+                        break
+
+                    if isinstance(highest_current_temp, Exception):
+                        print(f"\nError accessing GPU information: {highest_current_temp}. Skipping cool down.", file=sys.stderr)
+                        break
+
+                    # If any GPU exceeds the target, the hottest one does
+                    any_gpu_too_hot = highest_current_temp > waitTemperature
+
+                    if any_gpu_too_hot:
+                        if initial_peak_temp_this_hot_cycle is None:
+                            initial_peak_temp_this_hot_cycle = highest_current_temp
+
+                        # Update peak if temperature spikes higher mid-cooldown
+                        if highest_current_temp > initial_peak_temp_this_hot_cycle:
+                            initial_peak_temp_this_hot_cycle = highest_current_temp
+
+                        if not cooling_message_printed_this_cycle:
+                            print(f"***** GPU temperature ({highest_current_temp:.1f}°C) exceeds target ({waitTemperature}°C). Initiating cool down...")
+                            cooling_message_printed_this_cycle = True
+
+                        _display(highest_current_temp, target_f, initial_peak_temp_this_hot_cycle)
+                    else:
+                        if initial_peak_temp_this_hot_cycle is not None:
+                            # Display final 100% progress and the completion message in one write
+                            _display(target_f, target_f, initial_peak_temp_this_hot_cycle,
+                                     suffix="\n***** GPU cool down complete. Temperature is at or below target.\n")
+
+                        initial_peak_temp_this_hot_cycle = None
+                        cooling_message_printed_this_cycle = False
+                        break
+            finally:
+                poller.stop()
 
         if waitSeconds > 0:
-            for i in range(waitSeconds, 0, -1):
-                full_line = f"\r***** Waiting: {i} / {waitSeconds} seconds    "
+            # Refresh the countdown every few seconds rather than every second
+            deadline = time.monotonic() + waitSeconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                full_line = f"\r***** Waiting: {math.ceil(remaining)} / {waitSeconds} seconds    "
                 sys.stdout.write(full_line)
                 sys.stdout.flush()
-                time.sleep(1)
+                time.sleep(min(5, remaining))
 
             print(f"\r***** Waited: {waitSeconds} seconds         ")
 
-        # Print timestamp and return input unchanged
+        # Print timestamp and return input unchanged. Wall-clock time is only
+        # used for display; all waiting is timed with time.monotonic().
         now = time.time()
         time_tuple = time.localtime(now)
         formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", time_tuple)